@@ -9,12 +9,21 @@ import sys
 import os
 import subprocess
 import re
+import math
+import argparse
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from cli.main import GitNachtCLI
 
+def fps_type(value):
+    """Frames per second for export-timeline; APNG stores frame delays as 16-bit milliseconds"""
+    fps = float(value)
+    if not math.isfinite(fps) or fps <= 0 or 1000 / fps > 65535:
+        raise argparse.ArgumentTypeError(f"must be at least {1000 / 65535:.4f}, got {value}")
+    return fps
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python git-nacht.py <command>")
@@ -23,6 +32,9 @@ def main():
         print("  python git-nacht.py commit -m 'message'")
         print("  python git-nacht.py shot localhost:5173/dashboard")
         print("  python git-nacht.py shot localhost:5173/features")
+        print("  python git-nacht.py sync")
+        print("  python git-nacht.py server stop")
+        print("  python git-nacht.py export-timeline localhost:5173/dashboard -o dashboard.png")
         sys.exit(1)
 
     command = ' '.join(sys.argv[1:])
@@ -52,6 +64,42 @@ def main():
         cli.handle_nacht_command(url)
         return
 
+    # Handle sync command (push journaled shots to the database)
+    if command == 'sync':
+        success = cli.handle_sync_command()
+        sys.exit(0 if success else 1)
+
+    # Handle server command (managed dev server)
+    if command.startswith('server'):
+        parts = command.split()
+        success = cli.handle_server_command(parts[1] if len(parts) > 1 else 'status')
+        sys.exit(0 if success else 1)
+
+    # Handle export-timeline command (animated history of one route)
+    if command.startswith('export-timeline'):
+        parser = argparse.ArgumentParser(prog='git-nacht.py export-timeline')
+        parser.add_argument('url', help='Route whose screenshots to export, e.g. localhost:5173/dashboard')
+        parser.add_argument('-o', '--output', help='Output .png file, or directory for --format frames (default: timeline.png / timeline/)')
+        parser.add_argument('--format', choices=['apng', 'frames'], default='apng')
+        parser.add_argument('--width', type=int, default=960)
+        parser.add_argument('--height', type=int, default=540)
+        parser.add_argument('--fps', type=fps_type, default=2)
+        parser.add_argument('--workers', type=int, default=0, help='Decode frames in a process pool of this size')
+        parser.add_argument('--project', type=int, help='Project ID (defaults to the current repository)')
+        args = parser.parse_args(sys.argv[2:])
+        if args.output is None:
+            args.output = 'timeline.png' if args.format == 'apng' else 'timeline'
+
+        url = args.url
+        if not url.startswith(('http://', 'https://')):
+            url = f"http://{url}"
+
+        success = cli.handle_export_timeline_command(
+            url, args.output, fmt=args.format, width=args.width, height=args.height,
+            fps=args.fps, workers=args.workers, project_id=args.project
+        )
+        sys.exit(0 if success else 1)
+
     # Handle legacy nacht command for backwards compatibility
     if command.startswith('nacht'):
         url_match = re.search(r'-url\s+["\']?([^"\']+)["\']?', command)
@@ -6,6 +6,9 @@ import os
 import sys
 import subprocess
 import re
+import time
+import argparse
+from contextlib import redirect_stdout
 from datetime import datetime
 from pathlib import Path
 
@@ -13,16 +16,24 @@ from pathlib import Path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from models.database import Database
+from models.journal import LocalJournal
+from models.sync import SyncEngine
+from services.devserver_service import DevServerManager
+
+# Connects slower than this skip the inline sync at the end of a shot
+SLOW_CONNECT_SECONDS = 1.0
 
 class GitNachtCLI:
     def __init__(self):
         self.db = Database()
+        self.journal = LocalJournal()
+        self.devserver = DevServerManager()
         self.project_root = os.path.join(os.path.dirname(__file__), '..', '..')
         self.user_id = None
         
     def authenticate(self):
         """Authenticate user with interactive login"""
-        if not self.db.connect():
+        if not self.is_online() and not self.db.connect():
             print("❌ Could not connect to database")
             return False
         
@@ -33,8 +44,26 @@ class GitNachtCLI:
         password = getpass.getpass("Password: ")
         
         self.user_id = self.db.authenticate_user(email, password)
+        if self.user_id is not None:
+            # Remember the user so shots can be journaled while offline
+            self.journal.set_meta('user_id', self.user_id)
         return self.user_id is not None
     
+    def is_online(self):
+        """Check if the database connection is open"""
+        return self.db.connection is not None and self.db.connection.is_connected()
+    
+    def use_cached_user(self):
+        """Fall back to the last authenticated user when the database is unreachable"""
+        user_id = self.journal.get_meta('user_id')
+        if user_id is None:
+            print("❌ No cached login found. Connect to the database and log in once first.")
+            return False
+        
+        self.user_id = int(user_id)
+        print(f"📦 Offline - using cached login (user {self.user_id}), shots will be synced later")
+        return True
+    
     def has_recent_commit(self):
         """Check if there's a recent commit (within last 5 minutes)"""
         try:
@@ -70,7 +99,7 @@ class GitNachtCLI:
             return False
         
     def take_screenshot(self, url):
-        """Take screenshot using Selenium and save to PHP backend path"""
+        """Take screenshot using Selenium and record it in the local journal"""
         try:
             from selenium import webdriver
             from selenium.webdriver.chrome.options import Options
@@ -112,24 +141,19 @@ class GitNachtCLI:
                 
                 print(f"✅ Screenshot saved: {filename}")
                 
-                # Save to database
-                project_id = self.db.get_current_project_id(self.user_id)
+                # Journal locally; the sync engine pushes it to the database
                 relative_path = f"uploads/screenshots/{filename}"  # Path relative to backend
                 
-                screenshot_id = self.db.save_screenshot(
-                    project_id=project_id,
+                self.journal.record_capture(
+                    repository_url=self.db.get_repository_url(),
                     commit_hash=commit_hash,
                     url=url,
-                    screenshot_path=relative_path,
+                    image_path=relative_path,
                     user_id=self.user_id or 1
                 )
                 
-                if screenshot_id:
-                    print(f"✅ Screenshot linked to project {project_id}")
-                    return True
-                else:
-                    print("⚠️  Screenshot saved but not linked to database")
-                    return False
+                print("✅ Screenshot recorded in local journal")
+                return True
                     
             finally:
                 driver.quit()
@@ -146,29 +170,273 @@ class GitNachtCLI:
         """Handle the nacht command to take screenshots"""
         print(f"🚀 Git Nacht CLI - Taking screenshot of {url}")
         
-        # Authenticate user
-        print("🔐 Authenticating...")
+        try:
+            # Start the target app if needed; it boots while we authenticate
+            if not self.devserver.start(url):
+                return False
+            
+            # Authenticate user, or fall back to the cached login when offline
+            print("🔐 Authenticating...")
+            connect_started = time.monotonic()
+            online = self.db.connect(timeout=self.db.connect_timeout)
+            # A slow connect means a slow network; leave syncing to 'sync' rather than stall the shot
+            slow_network = time.monotonic() - connect_started > SLOW_CONNECT_SECONDS
+            if online:
+                if not self.authenticate():
+                    print("❌ Authentication failed")
+                    return False
+            elif not self.use_cached_user():
+                return False
+            
+            # Take screenshot once the target is ready
+            if not self.devserver.wait_until_ready():
+                return False
+            
+            try:
+                success = self.take_screenshot(url)
+            finally:
+                self.devserver.release()
+            
+            if success:
+                print("🎉 Screenshot captured and saved successfully!")
+            else:
+                print("❌ Failed to capture screenshot")
+            
+            # Push one batch without retrying, so the shot never waits on the network
+            if self.is_online() and not slow_network:
+                SyncEngine(self.db, self.journal, max_retries=1).sync(max_batches=1)
+            else:
+                print(f"📦 {self.journal.count_pending()} capture(s) waiting to sync. Run: python git-nacht.py sync")
+            return success
+        finally:
+            # Close database and journal connections
+            self.db.disconnect()
+            self.journal.close()
+    
+    def handle_sync_command(self):
+        """Push journaled captures to the database, retrying with backoff"""
+        print("🔄 Git Nacht CLI - Syncing local journal")
+        
+        synced = SyncEngine(self.db, self.journal).sync()
+        
+        self.db.disconnect()
+        self.journal.close()
+        return synced is not None
+    
+    def handle_server_command(self, action):
+        """Manage the dev server started for captures"""
+        if action == 'stop':
+            if self.devserver.stop():
+                print("✅ Dev server stopped")
+            else:
+                print("ℹ️  No managed dev server running")
+            return True
+        
+        if action == 'status':
+            state = self.devserver.read_state()
+            if state:
+                idle = datetime.now().timestamp() - state.get('last_used', 0)
+                print(f"🟢 Dev server (PID {state['pid']}) on {state['host']}:{state['port']}, idle {idle:.0f}s")
+            else:
+                print("⚪ No managed dev server running")
+            return True
+        
+        print("❌ Unknown server action. Use: server status | server stop")
+        return False
+    
+    def resolve_project_id(self, project_id=None):
+        """Use the given project ID, or look up the current repository's project"""
+        if project_id is not None:
+            return project_id
+        
+        remote_url = self.db.get_repository_url()
+        project_id = self.db.find_project_id(remote_url, self.user_id) if remote_url else None
+        if not project_id:
+            print("❌ No project found for this repository. Use --project to choose one.")
+        return project_id
+    
+    def open_project(self, project_id=None):
+        """Authenticate and resolve the project for a read command; returns None on failure"""
         if not self.authenticate():
             print("❌ Authentication failed")
-            return False
+            return None
+        
+        project_id = self.resolve_project_id(project_id)
+        if not project_id:
+            self.db.disconnect()
+        return project_id
+    
+    def data_stdout(self, binary=False):
+        """Stdout for machine-readable output; newline='' stops CSV rows getting doubled carriage returns on Windows"""
+        if binary:
+            return sys.stdout.buffer
+        sys.stdout.reconfigure(newline='')
+        return sys.stdout
+    
+    def handle_list_command(self, fmt='text', project_id=None, url=None, after_id=0, limit=None):
+        """Stream a project's screenshots to stdout"""
+        output = sys.stdout if fmt == 'text' else self.data_stdout()
+        
+        # Keep prompts and status messages off stdout so the listing can be piped
+        with redirect_stdout(sys.stderr):
+            project_id = self.open_project(project_id)
+            if not project_id:
+                return False
+            
+            try:
+                rows = self.db.stream_screenshots(project_id, url=url, after_id=after_id, limit=limit)
+                if fmt == 'text':
+                    count = 0
+                    for row in rows:
+                        output.write(f"{row['id']:>8}  {row['created_at']}  {row['commit_hash'] or '-':<7}  {row['url']}\n")
+                        count += 1
+                else:
+                    from services.export_service import ScreenshotExporter
+                    count = ScreenshotExporter(self.db).export_rows(rows, output, fmt)
+                output.flush()
+            except Exception as e:
+                print(f"❌ Failed to list screenshots: {e}")
+                return False
+            finally:
+                self.db.disconnect()
+            
+            print(f"📋 {count} screenshot(s) in project {project_id}")
+            return True
+    
+    def handle_export_command(self, output='-', fmt='jsonl', images=False, project_id=None, url=None, after_id=0, limit=None):
+        """Export a project's screenshots as JSON lines or CSV, optionally bundled with images in a tar"""
+        if output == '-':
+            stream = self.data_stdout(binary=images)
+        else:
+            stream = None
+        
+        with redirect_stdout(sys.stderr):
+            project_id = self.open_project(project_id)
+            if not project_id:
+                return False
+            
+            from services.export_service import ScreenshotExporter
+            exporter = ScreenshotExporter(self.db)
+            rows = self.db.stream_screenshots(project_id, url=url, after_id=after_id, limit=limit)
+            
+            try:
+                if stream is None:
+                    stream = open(output, 'wb') if images else open(output, 'w', newline='', encoding='utf-8')
+                
+                try:
+                    if images:
+                        count = exporter.export_tar(rows, stream, fmt)
+                    else:
+                        count = exporter.export_rows(rows, stream, fmt)
+                    stream.flush()
+                finally:
+                    if output != '-':
+                        stream.close()
+            except Exception as e:
+                print(f"❌ Export failed: {e}")
+                return False
+            finally:
+                self.db.disconnect()
+            
+            print(f"🎉 Exported {count} screenshot(s) from project {project_id}")
+            return True
+    
+    def handle_setup_command(self):
+        """Create or update the tables the CLI writes to"""
+        print("🛠️  Git Nacht CLI - Setting up database")
         
-        # Ensure screenshots table exists
-        if not self.db.create_screenshots_table_if_not_exists():
-            print("❌ Failed to setup screenshots table")
+        if not self.db.connect():
             return False
         
-        # Take screenshot
-        success = self.take_screenshot(url)
+        success = self.db.create_screenshots_table_if_not_exists() and self.db.ensure_client_key_column()
+        self.db.disconnect()
         
         if success:
-            print("🎉 Screenshot captured and saved successfully!")
-        else:
-            print("❌ Failed to capture screenshot")
+            print("🎉 Database is ready")
+        return success
+    
+    def handle_login_command(self):
+        """Log in and cache the user for offline shots"""
+        success = self.authenticate()
+        if not success:
+            print("❌ Authentication failed")
         
-        # Close database connection
         self.db.disconnect()
+        self.journal.close()
         return success
     
+    def handle_status_command(self):
+        """Show database, project, journal and dev server status"""
+        print("📊 Git Nacht status")
+        
+        remote_url = self.db.get_repository_url()
+        print(f"   Repository: {remote_url or 'no origin remote'}")
+        print(f"   Commit:     {self.db.get_latest_commit_hash()}")
+        
+        # Look the project up the same way list and export do, preferring the cached user's own
+        user_id = self.journal.get_meta('user_id')
+        
+        if self.db.connect():
+            print(f"   Database:   connected to {self.db.host}:{self.db.port}/{self.db.database}")
+            try:
+                project_id = self.db.find_project_id(remote_url, int(user_id) if user_id else None) if remote_url else None
+                if project_id:
+                    count, latest = self.db.get_screenshot_stats(project_id)
+                    print(f"   Project:    {project_id} ({count} screenshot(s), latest {latest or 'never'})")
+                else:
+                    print("   Project:    not created yet")
+            except Exception as e:
+                print(f"   Project:    ❌ {e}")
+            self.db.disconnect()
+        else:
+            print("   Database:   unreachable")
+        
+        print(f"   Login:      {'user ' + user_id if user_id else 'none cached'}")
+        print(f"   Journal:    {self.journal.count_pending()} capture(s) waiting to sync")
+        self.journal.close()
+        
+        state = self.devserver.read_state()
+        if state:
+            print(f"   Dev server: PID {state['pid']} on {state['host']}:{state['port']}")
+        else:
+            print("   Dev server: not managed")
+        return True
+    
+    def handle_export_timeline_command(self, url, output, fmt='apng', width=960, height=540, fps=2, workers=0, project_id=None):
+        """Export a route's screenshot history as an animated PNG or image sequence"""
+        print(f"🎞️  Git Nacht CLI - Exporting timeline of {url}")
+        
+        print("🔐 Authenticating...")
+        if not self.authenticate():
+            print("❌ Authentication failed")
+            return False
+        
+        project_id = self.resolve_project_id(project_id)
+        if not project_id:
+            self.db.disconnect()
+            return False
+        
+        try:
+            from services.timeline_service import TimelineExporter
+            
+            exporter = TimelineExporter(self.db, width=width, height=height, fps=fps, workers=workers)
+            frames = exporter.export(project_id, url, output, fmt)
+        except ImportError:
+            print("❌ Required packages not installed. Run:")
+            print("   pip install Pillow")
+            return False
+        except Exception as e:
+            print(f"❌ Timeline export failed: {e}")
+            return False
+        finally:
+            self.db.disconnect()
+        
+        if frames:
+            print(f"🎉 Exported {frames} frames to {output}")
+        else:
+            print(f"⚠️  No screenshots found for {url} in project {project_id}")
+        return frames > 0
+    
     def execute_git_command(self, command):
         """Execute git command normally"""
         try:
@@ -183,3 +451,60 @@ class GitNachtCLI:
         except Exception as e:
             print(f"❌ Git command failed: {e}")
             return False
+
+
+def normalize_url(url):
+    if url and not url.startswith(('http://', 'https://')):
+        return f"http://{url}"
+    return url
+
+def cli():
+    """Entry point for python -m src.cli.main"""
+    parser = argparse.ArgumentParser(prog='git-nacht', description='Git Nacht - Visual Patch Notes CLI')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    filters = argparse.ArgumentParser(add_help=False)
+    filters.add_argument('--project', type=int, help='Project ID (defaults to the current repository)')
+    filters.add_argument('--url', help='Only screenshots of this URL')
+    filters.add_argument('--after-id', type=int, default=0, help='Resume after this screenshot ID')
+    filters.add_argument('--limit', type=int, help='Stop after this many screenshots')
+    
+    list_parser = subparsers.add_parser('list', parents=[filters], help='List screenshots')
+    list_parser.add_argument('--format', choices=['text', 'jsonl', 'csv'], default='text')
+    
+    export_parser = subparsers.add_parser('export', parents=[filters], help='Export screenshots')
+    export_parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+    export_parser.add_argument('--images', action='store_true', help='Write a tar stream with the image files')
+    export_parser.add_argument('-o', '--output', default='-', help='Output file (default: stdout)')
+    
+    subparsers.add_parser('status', help='Show database, journal and dev server status')
+    subparsers.add_parser('setup', help='Create the screenshots table and sync columns')
+    subparsers.add_parser('login', help='Log in and cache the user for offline shots')
+    
+    args = parser.parse_args()
+    if not args.command:
+        parser.print_help()
+        sys.exit(1)
+    
+    app = GitNachtCLI()
+    if args.command == 'list':
+        success = app.handle_list_command(
+            fmt=args.format, project_id=args.project, url=normalize_url(args.url),
+            after_id=args.after_id, limit=args.limit
+        )
+    elif args.command == 'export':
+        success = app.handle_export_command(
+            output=args.output, fmt=args.format, images=args.images, project_id=args.project,
+            url=normalize_url(args.url), after_id=args.after_id, limit=args.limit
+        )
+    elif args.command == 'setup':
+        success = app.handle_setup_command()
+    elif args.command == 'login':
+        success = app.handle_login_command()
+    else:
+        success = app.handle_status_command()
+    
+    sys.exit(0 if success else 1)
+
+if __name__ == '__main__':
+    cli()
@@ -9,6 +9,17 @@ import os
 from datetime import datetime
 import json
 
+def getenv_number(name, default, cast=float):
+    """Read a numeric setting, falling back to the default if it isn't a number"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        print(f"⚠️  Ignoring invalid {name}={value!r}, using {default}")
+        return default
+
 class Database:
     def __init__(self):
         # Load environment variables from backend .env file
@@ -19,6 +30,8 @@ class Database:
         self.database = os.getenv('DB_NAME', 'git_nacht')
         self.user = os.getenv('DB_USER', 'root')
         self.password = os.getenv('DB_PASSWORD', '')
+        # Short timeout used on the shot path so an unreachable host falls back to the journal quickly
+        self.connect_timeout = getenv_number('DB_CONNECT_TIMEOUT', 5, int)
         
         # Screenshot upload path (same as PHP backend)
         self.upload_path = os.getenv('UPLOAD_PATH', os.path.join(
@@ -41,15 +54,20 @@ class Database:
                         key, value = line.split('=', 1)
                         os.environ[key.strip()] = value.strip()
     
-    def connect(self):
-        """Connect to MySQL database"""
+    def connect(self, timeout=None):
+        """Connect to MySQL database, optionally giving up after timeout seconds"""
         try:
+            options = {}
+            if timeout:
+                options['connection_timeout'] = timeout
+            
             self.connection = mysql.connector.connect(
                 host=self.host,
                 port=self.port,
                 database=self.database,
                 user=self.user,
-                password=self.password
+                password=self.password,
+                **options
             )
             return True
         except mysql.connector.Error as err:
@@ -166,11 +184,8 @@ class Database:
             print(f"❌ Authentication failed: {e}")
             return None
     
-    def get_current_project_id(self, user_id=None):
-        """
-        Get current project ID based on git remote URL and user
-        This connects to your existing projects in the PHP database
-        """
+    def get_repository_url(self):
+        """Get the git remote URL of the current repository"""
         try:
             import subprocess
             result = subprocess.run(
@@ -179,34 +194,45 @@ class Database:
                 text=True,
                 cwd=os.path.join(os.path.dirname(__file__), '..', '..')
             )
-            
             if result.returncode == 0:
-                remote_url = result.stdout.strip()
-                
-                # Query database for project with matching repository URL
-                cursor = self.connection.cursor()
-                if user_id:
-                    # Look for project owned by this user first
-                    query = "SELECT id FROM projects WHERE repository_url = %s AND user_id = %s LIMIT 1"
-                    cursor.execute(query, (remote_url, user_id))
-                    result = cursor.fetchone()
-                    
-                    if not result:
-                        # If no user-specific project, look for any project with this URL
-                        query = "SELECT id FROM projects WHERE repository_url = %s LIMIT 1"
-                        cursor.execute(query, (remote_url,))
-                        result = cursor.fetchone()
-                else:
-                    # No user specified, look for any project with this URL
-                    query = "SELECT id FROM projects WHERE repository_url = %s LIMIT 1"
-                    cursor.execute(query, (remote_url,))
-                    result = cursor.fetchone()
-                
-                cursor.close()
+                return result.stdout.strip()
+        except Exception as e:
+            print(f"❌ Failed to get repository URL: {e}")
+        return None
+    
+    def find_project_id(self, remote_url, user_id=None):
+        """Find an existing project for a repository URL, preferring the user's own"""
+        cursor = self.connection.cursor()
+        result = None
+        if user_id:
+            # Look for project owned by this user first
+            query = "SELECT id FROM projects WHERE repository_url = %s AND user_id = %s LIMIT 1"
+            cursor.execute(query, (remote_url, user_id))
+            result = cursor.fetchone()
+        
+        if not result:
+            # Fall back to any project with this URL
+            query = "SELECT id FROM projects WHERE repository_url = %s LIMIT 1"
+            cursor.execute(query, (remote_url,))
+            result = cursor.fetchone()
+        
+        cursor.close()
+        return result[0] if result else None
+    
+    def get_current_project_id(self, user_id=None):
+        """
+        Get current project ID based on git remote URL and user
+        This connects to your existing projects in the PHP database
+        """
+        try:
+            remote_url = self.get_repository_url()
+            
+            if remote_url:
+                project_id = self.find_project_id(remote_url, user_id)
                 
-                if result:
-                    print(f"✅ Found project ID: {result[0]} for repository: {remote_url}")
-                    return result[0]
+                if project_id:
+                    print(f"✅ Found project ID: {project_id} for repository: {remote_url}")
+                    return project_id
                 else:
                     print(f"⚠️  No project found for repository: {remote_url}")
                     # Create a new project for this repository
@@ -217,7 +243,7 @@ class Database:
         
         return None
     
-    def create_project_for_repo(self, repository_url, user_id=1):
+    def create_project_for_repo(self, repository_url, user_id=1, fallback=1):
         """Create a new project for the current repository"""
         try:
             # Extract project name from repository URL
@@ -249,7 +275,7 @@ class Database:
             
         except Exception as e:
             print(f"❌ Failed to create project: {e}")
-            return 1  # Fallback
+            return fallback
     
     def create_screenshots_table_if_not_exists(self):
         """Create screenshots table if it doesn't exist"""
@@ -283,3 +309,136 @@ class Database:
         except mysql.connector.Error as err:
             print(f"❌ Failed to create screenshots table: {err}")
             return False
+    
+    def ensure_client_key_column(self):
+        """Add the idempotency key column used by journal sync if it's missing"""
+        if not self.connection or not self.connection.is_connected():
+            return False
+        
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("SHOW COLUMNS FROM screenshots LIKE 'client_key'")
+            if not cursor.fetchall():
+                cursor.execute("ALTER TABLE screenshots ADD COLUMN client_key VARCHAR(32) NULL UNIQUE")
+                self.connection.commit()
+                print("✅ Added client_key column to screenshots table")
+            cursor.close()
+            return True
+            
+        except mysql.connector.Error as err:
+            print(f"❌ Failed to add client_key column: {err}")
+            return False
+    
+    def save_screenshots_batch(self, rows):
+        """
+        Save a batch of journaled screenshots in a single transaction
+        Each row is (client_key, project_id, commit_hash, url, image_path, user_id, created_at).
+        Rows already pushed are skipped via their client_key.
+        Returns a dict of client_key -> screenshot ID; raises mysql.connector.Error on failure.
+        """
+        if not rows:
+            return {}
+        
+        cursor = self.connection.cursor()
+        try:
+            query = """
+                INSERT INTO screenshots (client_key, project_id, commit_hash, url, image_path, user_id, created_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE client_key = client_key
+            """
+            cursor.executemany(query, rows)
+            
+            keys = [row[0] for row in rows]
+            placeholders = ', '.join(['%s'] * len(keys))
+            cursor.execute(
+                f"SELECT client_key, id FROM screenshots WHERE client_key IN ({placeholders})",
+                keys
+            )
+            ids = dict(cursor.fetchall())
+            self.connection.commit()
+            return ids
+            
+        except mysql.connector.Error:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+    
+    def resolve_image_path(self, image_path):
+        """Map a stored screenshot path to the file in the upload directory"""
+        return os.path.join(self.upload_path, os.path.basename(image_path))
+    
+    def stream_rows(self, query, params=(), batch_size=500):
+        """
+        Yield rows from a query as the server sends them
+        Uses an unbuffered cursor so the full result set is never held in memory
+        """
+        cursor = self.connection.cursor(buffered=False)
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        finally:
+            # Drain anything left unread so the connection can be reused
+            if self.connection.unread_result:
+                self.connection.consume_results()
+            cursor.close()
+    
+    def stream_screenshots(self, project_id, url=None, after_id=0, limit=None, page_size=1000, order_by='id'):
+        """
+        Stream screenshots for a project using keyset pagination
+        Each page is a short query resuming after the last row seen, so long exports
+        don't hold one query open. order_by is 'id' or 'created_at' (ties broken by ID);
+        after_id skips screenshots up to that ID, which resumes an ID-ordered export.
+        Yields dicts with the screenshot columns.
+        """
+        if order_by not in ('id', 'created_at'):
+            raise ValueError(f"Unsupported screenshot order: {order_by}")
+        
+        columns = ['id', 'project_id', 'commit_hash', 'url', 'image_path', 'user_id', 'created_at']
+        order = 'created_at, id' if order_by == 'created_at' else 'id'
+        remaining = limit
+        last = None
+        
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            query = f"SELECT {', '.join(columns)} FROM screenshots WHERE project_id = %s AND id > %s"
+            params = [project_id, after_id]
+            if url:
+                query += " AND url = %s"
+                params.append(url)
+            if last is not None:
+                query += " AND (created_at > %s OR (created_at = %s AND id > %s))"
+                params.extend([last['created_at'], last['created_at'], last['id']])
+            query += f" ORDER BY {order} LIMIT %s"
+            params.append(size)
+            
+            count = 0
+            for row in self.stream_rows(query, params):
+                count += 1
+                row = dict(zip(columns, row))
+                if order_by == 'id':
+                    after_id = row['id']
+                else:
+                    last = row
+                yield row
+            
+            if remaining is not None:
+                remaining -= count
+            if count < size:
+                break
+    
+    def get_screenshot_stats(self, project_id):
+        """Get (count, latest created_at) of a project's screenshots"""
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "SELECT COUNT(*), MAX(created_at) FROM screenshots WHERE project_id = %s",
+            (project_id,)
+        )
+        result = cursor.fetchone()
+        cursor.close()
+        return result
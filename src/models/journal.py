@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Local capture journal for Git Nacht Python CLI
+Records screenshots in an append-only SQLite journal so shots never wait on MySQL
+"""
+
+import sqlite3
+import os
+import uuid
+from datetime import datetime
+
+class LocalJournal:
+    def __init__(self, path=None):
+        self.path = path or os.getenv('JOURNAL_PATH', os.path.join(
+            os.path.dirname(__file__), '..', '..', 'data', 'journal.db'
+        ))
+        self.connection = None
+
+    def open(self):
+        """Open the journal, creating it in WAL mode if needed"""
+        if self.connection:
+            return self.connection
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS captures (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                client_key TEXT NOT NULL UNIQUE,
+                repository_url TEXT,
+                commit_hash TEXT,
+                url TEXT,
+                image_path TEXT NOT NULL,
+                user_id INTEGER,
+                created_at TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                remote_id INTEGER,
+                synced_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_captures_pending ON captures (synced_at, id);
+            CREATE TABLE IF NOT EXISTS projects (
+                repository_url TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                project_id INTEGER NOT NULL,
+                PRIMARY KEY (repository_url, user_id)
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self.connection.commit()
+        return self.connection
+
+    def close(self):
+        """Close the journal"""
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    def record_capture(self, repository_url, commit_hash, url, image_path, user_id):
+        """
+        Append a capture to the journal
+        Returns the idempotency key used when the capture is pushed to MySQL
+        """
+        conn = self.open()
+        client_key = uuid.uuid4().hex
+
+        conn.execute("""
+            INSERT INTO captures (client_key, repository_url, commit_hash, url, image_path, user_id, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            client_key,
+            repository_url,
+            commit_hash,
+            url,
+            image_path,
+            user_id,
+            datetime.now().isoformat(sep=' ', timespec='seconds')
+        ))
+        conn.commit()
+        return client_key
+
+    def pending_captures(self, limit=100, after_id=0):
+        """Get captures not yet pushed to MySQL, oldest first"""
+        conn = self.open()
+        cursor = conn.execute("""
+            SELECT id, client_key, repository_url, commit_hash, url, image_path, user_id, created_at
+            FROM captures
+            WHERE synced_at IS NULL AND id > ?
+            ORDER BY id
+            LIMIT ?
+        """, (after_id, limit))
+        return cursor.fetchall()
+
+    def count_pending(self):
+        """Count captures waiting to be synced"""
+        conn = self.open()
+        return conn.execute("SELECT COUNT(*) FROM captures WHERE synced_at IS NULL").fetchone()[0]
+
+    def mark_synced(self, id_pairs):
+        """Mark captures as synced; id_pairs is a list of (journal_id, remote_id)"""
+        conn = self.open()
+        synced_at = datetime.now().isoformat(sep=' ', timespec='seconds')
+        conn.executemany(
+            "UPDATE captures SET synced_at = ?, remote_id = ?, last_error = NULL WHERE id = ?",
+            [(synced_at, remote_id, journal_id) for journal_id, remote_id in id_pairs]
+        )
+        conn.commit()
+
+    def mark_failed(self, journal_ids, error):
+        """Record a failed sync attempt for the given captures"""
+        conn = self.open()
+        conn.executemany(
+            "UPDATE captures SET attempts = attempts + 1, last_error = ? WHERE id = ?",
+            [(str(error), journal_id) for journal_id in journal_ids]
+        )
+        conn.commit()
+
+    def get_project_id(self, repository_url, user_id):
+        """Get the reconciled MySQL project ID for a repository, if known"""
+        conn = self.open()
+        row = conn.execute(
+            "SELECT project_id FROM projects WHERE repository_url = ? AND user_id = ?",
+            (repository_url or '', user_id or 0)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_project_id(self, repository_url, user_id, project_id):
+        """Remember the MySQL project ID a repository maps to"""
+        conn = self.open()
+        conn.execute(
+            "INSERT OR REPLACE INTO projects (repository_url, user_id, project_id) VALUES (?, ?, ?)",
+            (repository_url or '', user_id or 0, project_id)
+        )
+        conn.commit()
+
+    def clear_project_id(self, repository_url, user_id):
+        """Forget a cached project ID, e.g. after the project was deleted"""
+        conn = self.open()
+        conn.execute(
+            "DELETE FROM projects WHERE repository_url = ? AND user_id = ?",
+            (repository_url or '', user_id or 0)
+        )
+        conn.commit()
+
+    def get_meta(self, key, default=None):
+        """Read a value from the journal metadata"""
+        conn = self.open()
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        """Write a value to the journal metadata"""
+        conn = self.open()
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+        conn.commit()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Sync engine for Git Nacht Python CLI
+Pushes journaled captures to the PHP backend's MySQL database in batches
+"""
+
+import time
+
+import mysql.connector
+
+# MySQL error for an insert referencing a missing parent row, here a deleted project
+FOREIGN_KEY_ERRNO = 1452
+
+class SyncEngine:
+    def __init__(self, db, journal, batch_size=100, max_retries=5, base_delay=1.0):
+        self.db = db
+        self.journal = journal
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+
+    def is_connected(self):
+        return self.db.connection is not None and self.db.connection.is_connected()
+
+    def backoff(self, attempt):
+        """Sleep before the next retry, doubling the delay each attempt"""
+        delay = self.base_delay * (2 ** attempt)
+        print(f"⏳ Retrying in {delay:.0f}s...")
+        time.sleep(delay)
+
+    def connect(self):
+        """Connect to MySQL, retrying with exponential backoff"""
+        for attempt in range(self.max_retries):
+            if self.is_connected() or self.db.connect():
+                return True
+            if attempt < self.max_retries - 1:
+                self.backoff(attempt)
+        return False
+
+    def resolve_project_id(self, repository_url, user_id):
+        """
+        Map a repository to its MySQL project ID
+        Projects for repositories first captured offline are created here
+        """
+        project_id = self.journal.get_project_id(repository_url, user_id)
+        if project_id:
+            return project_id
+
+        if repository_url:
+            project_id = self.db.find_project_id(repository_url, user_id)
+            if not project_id:
+                print(f"⚠️  No project found for repository: {repository_url}")
+                project_id = self.db.create_project_for_repo(repository_url, user_id or 1, fallback=None)
+        else:
+            print("⚠️  Capture has no repository URL, linking to default project")
+            project_id = 1
+
+        if project_id:
+            self.journal.set_project_id(repository_url, user_id, project_id)
+        return project_id
+
+    def build_rows(self, captures):
+        """Resolve project IDs and build screenshot rows; captures without a project are marked failed"""
+        rows = []
+        skipped = []
+        for journal_id, client_key, repository_url, commit_hash, url, image_path, user_id, created_at in captures:
+            project_id = self.resolve_project_id(repository_url, user_id)
+            if not project_id:
+                skipped.append(journal_id)
+                continue
+            rows.append((client_key, project_id, commit_hash, url, image_path, user_id or 1, created_at))
+
+        if skipped:
+            self.journal.mark_failed(skipped, "Could not resolve project")
+        return rows
+
+    def push_batch(self, captures):
+        """
+        Push one batch of captures, retrying the whole transaction on failure
+        Returns the number synced, or None if the connection was lost and couldn't be restored
+        """
+        journal_ids = {capture[1]: capture[0] for capture in captures}
+        for attempt in range(self.max_retries):
+            try:
+                rows = self.build_rows(captures)
+                remote_ids = self.db.save_screenshots_batch(rows)
+                self.journal.mark_synced([
+                    (journal_ids[client_key], remote_id) for client_key, remote_id in remote_ids.items()
+                ])
+                return len(remote_ids)
+            except mysql.connector.Error as err:
+                print(f"❌ Failed to sync batch: {err}")
+                self.journal.mark_failed(list(journal_ids.values()), err)
+                if err.errno == FOREIGN_KEY_ERRNO:
+                    # A cached project was deleted; resolve this batch's projects again
+                    for capture in captures:
+                        self.journal.clear_project_id(capture[2], capture[6])
+                    continue
+                if attempt < self.max_retries - 1:
+                    self.backoff(attempt)
+                    if not self.connect():
+                        break
+        return 0 if self.is_connected() else None
+
+    def sync(self, max_batches=None):
+        """
+        Push pending captures to MySQL, all of them or at most max_batches batches
+        Returns the number of captures synced, or None if the database is unreachable
+        """
+        pending = self.journal.count_pending()
+        if not pending:
+            return 0
+
+        if not self.connect():
+            print(f"📦 Database unreachable, {pending} capture(s) left in local journal")
+            return None
+
+        if not self.db.create_screenshots_table_if_not_exists() or not self.db.ensure_client_key_column():
+            return None
+
+        print(f"🔄 Syncing {pending} capture(s) to database...")
+        synced = 0
+        last_id = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            batches += 1
+            captures = self.journal.pending_captures(limit=self.batch_size, after_id=last_id)
+            if not captures:
+                break
+            last_id = captures[-1][0]
+            pushed = self.push_batch(captures)
+            if pushed is None:
+                print(f"📦 Lost database connection, {self.journal.count_pending()} capture(s) left in local journal")
+                return None
+            synced += pushed
+
+        remaining = self.journal.count_pending()
+        if remaining:
+            print(f"⚠️  Synced {synced} capture(s), {remaining} still pending")
+        else:
+            print(f"✅ Synced {synced} capture(s)")
+        return synced
@@ -0,0 +1 @@
+# Services module for Git Nacht Python CLI
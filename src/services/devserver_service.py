@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Dev server management for Git Nacht Python CLI
+Starts the target app when nothing is listening, reuses it across shots and stops it when idle
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '0.0.0.0', '::1')
+
+def is_port_open(host, port, timeout=0.5):
+    """Check if something accepts connections on host:port"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+def is_process_alive(pid):
+    """Check if a process is still running"""
+    if os.name == 'nt':
+        result = subprocess.run(
+            ['tasklist', '/FI', f'PID eq {pid}', '/NH'],
+            capture_output=True,
+            text=True
+        )
+        return str(pid) in result.stdout
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+def getenv_number(name, default):
+    """Read a numeric setting, falling back to the default if it isn't a number"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        print(f"⚠️  Ignoring invalid {name}={value!r}, using {default}")
+        return default
+
+class SPARequestHandler(SimpleHTTPRequestHandler):
+    """Serves a built app, falling back to index.html for client-side routes"""
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.exists(path):
+            self.path = '/index.html'
+        return super().send_head()
+
+    def log_message(self, format, *args):
+        pass
+
+class ThreadingHTTPServerV6(ThreadingHTTPServer):
+    address_family = socket.AF_INET6
+
+class DevServerManager:
+    def __init__(self):
+        project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+
+        # Relative directories are taken from the project root, not the shell's current directory
+        self.command = os.getenv('DEV_SERVER_COMMAND')
+        self.cwd = os.path.join(project_root, os.getenv('DEV_SERVER_CWD', 'frontend'))
+        self.static_dir = os.getenv('DEV_SERVER_STATIC_DIR')
+        if self.static_dir:
+            self.static_dir = os.path.join(project_root, self.static_dir)
+        self.start_timeout = getenv_number('DEV_SERVER_START_TIMEOUT', 60)
+        self.idle_timeout = getenv_number('DEV_SERVER_IDLE_TIMEOUT', 600)
+
+        data_dir = os.path.join(project_root, 'data')
+        self.state_path = os.path.join(data_dir, 'devserver.json')
+        self.log_path = os.path.join(data_dir, 'devserver.log')
+
+        self.host = None
+        self.port = None
+        self.process = None
+        self.pid = None
+        self.static_server = None
+
+    def read_state(self):
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write_state(self, state):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        with open(self.state_path, 'w') as f:
+            json.dump(state, f)
+
+    def touch(self):
+        """Mark the managed server as used, postponing its idle shutdown"""
+        state = self.read_state()
+        if state:
+            state['last_used'] = time.time()
+            self.write_state(state)
+
+    def start(self, url):
+        """
+        Make sure something will be serving url
+        Local targets with nothing listening are started from the static dir or dev server command.
+        Returns False if the target is down and can't be started.
+        """
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+
+        if self.host not in LOCAL_HOSTS:
+            return True
+
+        if is_port_open(self.host, self.port):
+            # Already running, either ours from an earlier shot or started by the user
+            self.touch()
+            return True
+
+        state = self.read_state()
+        if state and (state.get('host'), state.get('port')) == (self.host, self.port) and is_process_alive(state['pid']):
+            # Launched by an earlier shot and still booting; wait for it instead of starting another
+            print(f"⏳ Dev server (PID {state['pid']}) is still starting")
+            self.pid = state['pid']
+            self.touch()
+            return True
+
+        if self.static_dir:
+            return self.start_static_server()
+
+        if self.command:
+            return self.start_dev_server()
+
+        print(f"❌ Nothing is listening on {self.host}:{self.port}")
+        print("💡 Start your dev server, or set DEV_SERVER_COMMAND / DEV_SERVER_STATIC_DIR in backend/.env")
+        return False
+
+    def start_static_server(self):
+        """Serve the prebuilt app from this process"""
+        if not os.path.isdir(self.static_dir):
+            print(f"❌ Static directory not found: {self.static_dir}")
+            return False
+
+        handler = partial(SPARequestHandler, directory=self.static_dir)
+        server_class = ThreadingHTTPServerV6 if ':' in self.host else ThreadingHTTPServer
+        try:
+            self.static_server = server_class((self.host, self.port), handler)
+        except OSError as e:
+            print(f"❌ Could not serve {self.static_dir} on {self.host}:{self.port}: {e}")
+            return False
+        threading.Thread(target=self.static_server.serve_forever, daemon=True).start()
+
+        print(f"📂 Serving {self.static_dir} on {self.host}:{self.port}")
+        return True
+
+    def start_dev_server(self):
+        """Launch the dev server detached, with a watchdog that stops it when idle"""
+        state = self.read_state()
+        if state and is_process_alive(state['pid']):
+            # Only one server is tracked; stop the one serving another target before replacing it
+            print(f"🛑 Stopping dev server (PID {state['pid']}) on {state['host']}:{state['port']}")
+            if not self.stop():
+                return False
+
+        print(f"🚀 Starting dev server: {self.command}")
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+
+        kwargs = {}
+        if os.name == 'nt':
+            kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs['start_new_session'] = True
+
+        with open(self.log_path, 'a') as log:
+            self.process = subprocess.Popen(
+                self.command,
+                shell=True,
+                cwd=self.cwd,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                **kwargs
+            )
+        self.pid = self.process.pid
+
+        self.write_state({
+            'pid': self.process.pid,
+            'host': self.host,
+            'port': self.port,
+            'last_used': time.time(),
+        })
+
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), 'watch'],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+            **kwargs
+        )
+        return True
+
+    def wait_until_ready(self):
+        """Block until the target port accepts connections"""
+        if self.static_server or self.host not in LOCAL_HOSTS:
+            return True
+
+        deadline = time.time() + self.start_timeout
+        while time.time() < deadline:
+            if is_port_open(self.host, self.port):
+                self.touch()
+                return True
+            if self.process and self.process.poll() is not None:
+                print(f"❌ Dev server exited with code {self.process.returncode}, see {self.log_path}")
+                self.clear_state()
+                return False
+            if not self.process and self.pid and not is_process_alive(self.pid):
+                print(f"❌ Dev server exited while starting, see {self.log_path}")
+                self.clear_state()
+                return False
+            time.sleep(0.2)
+
+        print(f"❌ Dev server did not open {self.host}:{self.port} within {self.start_timeout:.0f}s")
+        return False
+
+    def release(self):
+        """Called after a capture; stops the in-process static server if one was started"""
+        if self.static_server:
+            self.static_server.shutdown()
+            self.static_server.server_close()
+            self.static_server = None
+        else:
+            self.touch()
+
+    def clear_state(self):
+        try:
+            os.remove(self.state_path)
+        except OSError:
+            pass
+
+    def stop(self):
+        """Stop the managed dev server, if one is running"""
+        state = self.read_state()
+        if not state:
+            return False
+
+        pid = state['pid']
+        if is_process_alive(pid):
+            try:
+                if os.name == 'nt':
+                    subprocess.run(['taskkill', '/PID', str(pid), '/T', '/F'], capture_output=True)
+                else:
+                    os.killpg(pid, signal.SIGTERM)
+            except OSError as e:
+                print(f"❌ Failed to stop dev server: {e}")
+                return False
+
+        self.clear_state()
+        return True
+
+    def watch(self, interval=5):
+        """Watchdog loop: stop the managed server once it's been idle for idle_timeout"""
+        while True:
+            time.sleep(interval)
+            state = self.read_state()
+            if not state:
+                return
+            if not is_process_alive(state['pid']):
+                self.clear_state()
+                return
+            if time.time() - state.get('last_used', 0) > self.idle_timeout:
+                self.stop()
+                return
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['watch']:
+        DevServerManager().watch()
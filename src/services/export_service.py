@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Screenshot export service for Git Nacht Python CLI
+Writes streamed screenshot rows as JSON lines, CSV or a tar bundle with the images
+"""
+
+import csv
+import io
+import json
+import os
+import tarfile
+import tempfile
+import time
+
+COLUMNS = ['id', 'project_id', 'commit_hash', 'url', 'image_path', 'user_id', 'created_at']
+
+def serialize(row):
+    """Make a screenshot row JSON/CSV friendly"""
+    row = dict(row)
+    if hasattr(row['created_at'], 'isoformat'):
+        row['created_at'] = row['created_at'].isoformat(sep=' ')
+    return row
+
+class RowWriter:
+    """Writes rows to a text stream as JSON lines or CSV"""
+
+    def __init__(self, stream, fmt='jsonl'):
+        self.stream = stream
+        self.fmt = fmt
+        self.csv_writer = None
+        if fmt == 'csv':
+            self.csv_writer = csv.DictWriter(stream, fieldnames=COLUMNS)
+            self.csv_writer.writeheader()
+
+    def write(self, row):
+        row = serialize(row)
+        if self.csv_writer:
+            self.csv_writer.writerow(row)
+        else:
+            self.stream.write(json.dumps(row) + '\n')
+
+class ScreenshotExporter:
+    def __init__(self, db):
+        self.db = db
+
+    def export_rows(self, rows, stream, fmt='jsonl'):
+        """Write rows to a text stream, returning the number written"""
+        writer = RowWriter(stream, fmt)
+        count = 0
+        for row in rows:
+            writer.write(row)
+            count += 1
+            if count % 1000 == 0:
+                stream.flush()
+        return count
+
+    def export_tar(self, rows, output, fmt='jsonl'):
+        """
+        Write a tar stream of the referenced images plus a metadata file
+        Images are streamed as rows arrive; metadata is written to a temp file and added last,
+        so memory stays constant and output starts with the first row.
+        """
+        count = 0
+        extension = 'csv' if fmt == 'csv' else 'jsonl'
+
+        with tempfile.TemporaryFile(mode='w+', encoding='utf-8', newline='') as metadata:
+            writer = RowWriter(metadata, fmt)
+
+            with tarfile.open(fileobj=output, mode='w|') as tar:
+                for row in rows:
+                    path = self.db.resolve_image_path(row['image_path'])
+                    if os.path.exists(path):
+                        tar.add(path, arcname=f"images/{os.path.basename(path)}")
+                    else:
+                        print(f"⚠️  Image not found for screenshot {row['id']}: {path}")
+                    writer.write(row)
+                    count += 1
+
+                metadata.flush()
+                size = metadata.buffer.seek(0, io.SEEK_END)
+                metadata.buffer.seek(0)
+
+                info = tarfile.TarInfo(f"screenshots.{extension}")
+                info.size = size
+                info.mtime = int(time.time())
+                tar.addfile(info, metadata.buffer)
+
+        return count
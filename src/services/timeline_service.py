@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Timeline export service for Git Nacht Python CLI
+Turns a route's screenshot history into an animated PNG or an image sequence
+"""
+
+import io
+import json
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+def render_frame(path, width, height):
+    """
+    Decode a screenshot, downscale it onto a fixed-size canvas and encode it as PNG
+    Runs in a worker process when a pool is used, so it must stay top-level
+    """
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image.draft('RGB', (width, height))
+        image = image.convert('RGB')
+        image.thumbnail((width, height))
+
+        canvas = Image.new('RGB', (width, height), (255, 255, 255))
+        canvas.paste(image, ((width - image.width) // 2, (height - image.height) // 2))
+
+    buffer = io.BytesIO()
+    canvas.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def read_chunks(png_bytes):
+    """Yield (type, data) for each chunk in a PNG file"""
+    offset = len(PNG_SIGNATURE)
+    while offset < len(png_bytes):
+        length, = struct.unpack('>I', png_bytes[offset:offset + 4])
+        chunk_type = png_bytes[offset + 4:offset + 8]
+        yield chunk_type, png_bytes[offset + 8:offset + 8 + length]
+        offset += length + 12
+
+def write_chunk(output, chunk_type, data):
+    output.write(struct.pack('>I', len(data)))
+    output.write(chunk_type)
+    output.write(data)
+    output.write(struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff))
+
+class APNGWriter:
+    """
+    Writes an animated PNG one frame at a time
+    Every frame must be an RGB PNG of the same size; nothing is kept after it's written
+    """
+
+    def __init__(self, path, delay_ms, loops=0):
+        self.path = path
+        self.delay_ms = delay_ms
+        self.loops = loops
+        self.output = None
+        self.actl_offset = None
+        self.sequence = 0
+        self.frames = 0
+
+    def open(self):
+        self.output = open(self.path, 'wb')
+        self.output.write(PNG_SIGNATURE)
+
+    def add_frame(self, png_bytes, row=None):
+        chunks = list(read_chunks(png_bytes))
+        ihdr = next(data for chunk_type, data in chunks if chunk_type == b'IHDR')
+        width, height = struct.unpack('>II', ihdr[:8])
+
+        if self.frames == 0:
+            write_chunk(self.output, b'IHDR', ihdr)
+            # Frame count is patched in close(), once it's known
+            self.actl_offset = self.output.tell()
+            write_chunk(self.output, b'acTL', struct.pack('>II', 0, self.loops))
+
+        write_chunk(self.output, b'fcTL', struct.pack(
+            '>IIIIIHHBB', self.sequence, width, height, 0, 0, self.delay_ms, 1000, 0, 0
+        ))
+        self.sequence += 1
+
+        for chunk_type, data in chunks:
+            if chunk_type != b'IDAT':
+                continue
+            if self.frames == 0:
+                write_chunk(self.output, b'IDAT', data)
+            else:
+                write_chunk(self.output, b'fdAT', struct.pack('>I', self.sequence) + data)
+                self.sequence += 1
+
+        self.frames += 1
+
+    def close(self):
+        if self.frames:
+            write_chunk(self.output, b'IEND', b'')
+            self.output.seek(self.actl_offset)
+            write_chunk(self.output, b'acTL', struct.pack('>II', self.frames, self.loops))
+        self.output.close()
+
+class FrameSequenceWriter:
+    """Writes numbered PNG frames plus a manifest.json describing them"""
+
+    def __init__(self, path, delay_ms):
+        self.path = path
+        self.delay_ms = delay_ms
+        self.manifest = None
+        self.frames = 0
+
+    def open(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.manifest = open(os.path.join(self.path, 'manifest.json'), 'w')
+        self.manifest.write('{"delay_ms": %d, "frames": [' % self.delay_ms)
+
+    def add_frame(self, png_bytes, row):
+        filename = f"frame_{self.frames + 1:05d}.png"
+
+        with open(os.path.join(self.path, filename), 'wb') as f:
+            f.write(png_bytes)
+
+        entry = {
+            'file': filename,
+            'screenshot_id': row['id'],
+            'commit_hash': row['commit_hash'],
+            'url': row['url'],
+            'created_at': str(row['created_at']),
+        }
+        self.manifest.write((',' if self.frames else '') + '\n  ' + json.dumps(entry))
+        self.frames += 1
+
+    def close(self):
+        self.manifest.write('\n]}\n')
+        self.manifest.close()
+
+class TimelineExporter:
+    def __init__(self, db, width=960, height=540, fps=2, workers=0):
+        self.db = db
+        self.width = width
+        self.height = height
+        self.delay_ms = max(1, int(1000 / fps))
+        self.workers = workers
+
+    def iter_sources(self, project_id, url):
+        """Yield (row, file path) for each screenshot whose image is on disk"""
+        for row in self.db.stream_screenshots(project_id, url=url, order_by='created_at'):
+            path = self.db.resolve_image_path(row['image_path'])
+            if os.path.exists(path):
+                yield row, path
+            else:
+                print(f"⚠️  Skipping screenshot {row['id']}, file not found: {path}")
+
+    def iter_frames(self, sources):
+        """
+        Yield (row, png bytes) in order
+        With workers, decoding runs in a process pool with a bounded number of frames in flight
+        """
+        if not self.workers:
+            for row, path in sources:
+                yield row, render_frame(path, self.width, self.height)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+            for row, path in sources:
+                pending.append((row, pool.submit(render_frame, path, self.width, self.height)))
+                if len(pending) >= self.workers * 2:
+                    row, future = pending.popleft()
+                    yield row, future.result()
+            while pending:
+                row, future = pending.popleft()
+                yield row, future.result()
+
+    def export(self, project_id, url, output, fmt='apng'):
+        """
+        Export the timeline and return the number of frames written
+        The output is only created once the first frame is ready, so an empty history writes nothing
+        """
+        if fmt == 'apng':
+            writer = APNGWriter(output, self.delay_ms)
+        else:
+            writer = FrameSequenceWriter(output, self.delay_ms)
+
+        opened = False
+        try:
+            for row, png_bytes in self.iter_frames(self.iter_sources(project_id, url)):
+                if not opened:
+                    writer.open()
+                    opened = True
+                writer.add_frame(png_bytes, row)
+                if writer.frames % 100 == 0:
+                    print(f"🎞️  {writer.frames} frames written...")
+        finally:
+            if opened:
+                writer.close()
+
+        return writer.frames